@@ -84,25 +84,35 @@ def main():
                     else:
                         results.put_nowait(result)
 
-                file = input()
-                if file == "":
+                line = input()
+                if line == "":
                     continue
 
-                dirname = os.path.dirname(file)
-                res = pool.apply_async(
-                    run_worker,
-                    (
-                        os.path.join(input_path, file),
-                        os.path.join(output_path, dirname),
-                    ),
-                    callback=lambda _: print("##done##"),
-                )
-                results.put_nowait(res)
+                # one frame may carry several NUL-separated files
+                for file in line.split("\0"):
+                    if file == "":
+                        continue
+
+                    dirname = os.path.dirname(file)
+                    res = pool.apply_async(
+                        run_worker,
+                        (
+                            os.path.join(input_path, file),
+                            os.path.join(output_path, dirname),
+                        ),
+                        callback=lambda _: print("##done##"),
+                    )
+                    results.put_nowait(res)
             except EOFError:
                 break
         pool.close()
         pool.join()
 
+        # re-raise any worker failure that landed after stdin closed,
+        # so the parent sees a nonzero exit instead of a silent success
+        while not results.empty():
+            results.get_nowait().get()
+
 
 if __name__ == "__main__":
     main()
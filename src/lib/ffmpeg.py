@@ -96,6 +96,27 @@ async def to_wav(source: str, output: str, *args):
     )
 
 
+async def to_wav_many(pairs: list[tuple[str, str]]):
+    """Converts many files to WAV in a single ffmpeg process.
+
+    Amortizes process startup over many small files.
+    """
+
+    inputs = []
+    outputs = []
+    for i, (source, output) in enumerate(pairs):
+        inputs.extend(("-i", source))
+        outputs.extend(("-map", f"{i}:a", *WAV_ARGS, output))
+
+    process = await _spawn_ffmpeg(*inputs, *outputs, "-y")
+    result = await process.wait()
+
+    if result != 0:
+        raise SubprocessException(
+            f"Converting batch of {len(pairs)} files failed with exit code {result}"
+        )
+
+
 @dataclass
 class InputItem:
     """Class for passing input settings for merging."""
@@ -3,7 +3,11 @@ import os
 import re
 from lib import ffmpeg
 from util import Parallel, SubprocessException, find_files, spawn
-from util.rich_console import console, create_progress
+from util.rich_console import console, create_progress, refresh_periodically
+
+
+WAV_BATCH_SIZE = 64
+_NUMBER_PATTERN = re.compile(r"\d+")
 
 
 async def export_info(opusinfo_path: str, output_path: str):
@@ -15,8 +19,8 @@ async def export_info(opusinfo_path: str, output_path: str):
         "OpusToolZ",
         "./libs/OpusToolZ/OpusToolZ",
         "info",
-        os.path.abspath(opusinfo_path),
-        os.path.abspath(output_path),
+        opusinfo_path,
+        output_path,
     )
 
     result = await process.wait()
@@ -43,35 +47,32 @@ async def extract_sfx(
             "OpusToolZ",
             "./libs/OpusToolZ/OpusToolZ",
             "extract",
-            os.path.abspath(opusinfo_path),
-            os.path.abspath(output_dir),
+            opusinfo_path,
+            output_dir,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
         )
 
-        while not process.stdout.at_eof():
-            line = b""
-            try:
-                line = await asyncio.wait_for(process.stdout.readline(), 1)
-            except asyncio.TimeoutError:
-                # keep the UI responsive while waiting for next output
-                progress.refresh()
-                continue
-
-            stripped = line.decode().strip()
-
-            if stripped.startswith("Awaiting"):
-                # Give hashes
-                process.stdin.write(("\n".join(map(str, hashes)) + "\n\n").encode())
-                await process.stdin.drain()
-            elif stripped.startswith("Wrote"):
-                progress.advance(task_id)
-            elif (
-                stripped != ""
-                and not stripped.startswith("Found")
-                and not stripped.startswith("Loading")
-            ):
-                console.log(stripped)
+        # keep the UI responsive while waiting for next output
+        heartbeat = asyncio.create_task(refresh_periodically(progress))
+        try:
+            async for line in process.stdout:
+                stripped = line.decode().strip()
+
+                if stripped.startswith("Awaiting"):
+                    # Give hashes
+                    process.stdin.write(("\n".join(map(str, hashes)) + "\n\n").encode())
+                    await process.stdin.drain()
+                elif stripped.startswith("Wrote"):
+                    progress.advance(task_id)
+                elif (
+                    stripped != ""
+                    and not stripped.startswith("Found")
+                    and not stripped.startswith("Loading")
+                ):
+                    console.log(stripped)
+        finally:
+            heartbeat.cancel()
 
         result = await process.wait()
 
@@ -79,17 +80,24 @@ async def extract_sfx(
         raise SubprocessException("Exporting SFX failed with exit code " + str(result))
 
     if to_wav:
-        parallel = Parallel("Converting SFX to wavs")
-
-        async def convert(file: str):
-            await ffmpeg.to_wav(
-                os.path.join(output_dir, file),
-                os.path.join(output_dir, file.replace(".opus", ".wav")),
-            )
-            os.unlink(os.path.join(output_dir, file))
-
-        for file in find_files(output_dir, ".opus"):
-            parallel.run(convert, file)
+        parallel = Parallel("Converting SFX to wavs", unit="batch")
+
+        async def convert(batch: list[str]):
+            pairs = [
+                (
+                    os.path.join(output_dir, file),
+                    os.path.join(output_dir, file.replace(".opus", ".wav")),
+                )
+                for file in batch
+            ]
+            await ffmpeg.to_wav_many(pairs)
+            for source, _output in pairs:
+                os.unlink(source)
+
+        # batch files so process startup is amortized over many small SFX
+        opus_files = list(find_files(output_dir, ".opus"))
+        for start in range(0, len(opus_files), WAV_BATCH_SIZE):
+            parallel.run(convert, opus_files[start : start + WAV_BATCH_SIZE])
 
         await parallel.wait()
 
@@ -107,9 +115,9 @@ async def repack_sfx(opusinfo_path: str, input_dir: str, output_dir: str):
         "OpusToolZ",
         "./libs/OpusToolZ/OpusToolZ",
         "repack",
-        os.path.abspath(opusinfo_path),
-        os.path.abspath(input_dir),
-        os.path.abspath(output_dir),
+        opusinfo_path,
+        input_dir,
+        output_dir,
         stdout=asyncio.subprocess.PIPE,
     )
 
@@ -127,74 +135,68 @@ async def _report_repack_progress(process):
         packing_task_id = None
         writing_task_id = None
 
-        while not process.stdout.at_eof():
-            line = b""
-            try:
-                line = await asyncio.wait_for(process.stdout.readline(), 5)
-            except asyncio.TimeoutError:
-                # keep UI responsive while idle
-                progress.refresh()
-                continue
-
-            stripped = line.decode().strip()
-
-            if stripped.startswith("Found") and stripped.endswith("files to pack."):
-                # Switch to packing phase
-                if writing_task_id is not None:
-                    progress.update(writing_task_id, visible=False)
-
-                number = re.search(r"\d+", stripped).group()
-                total = int(number)
-
-                if packing_task_id is None:
-                    packing_task_id = progress.add_task(
-                        "Packing SFX", total=total, unit="file"
-                    )
-                else:
-                    progress.update(
-                        packing_task_id,
-                        total=total,
-                        completed=0,
-                        description="Packing SFX",
-                        unit="file",
-                        visible=True,
-                    )
-
-            elif stripped.startswith("Processed file"):
-                if packing_task_id is not None:
-                    progress.advance(packing_task_id)
-
-            elif stripped.startswith("Will write"):
-                # Switch to writing phase
-                if packing_task_id is not None:
-                    progress.update(packing_task_id, visible=False)
-
-                number = re.search(r"\d+", stripped).group()
-                total = int(number)
-
-                if writing_task_id is None:
-                    writing_task_id = progress.add_task(
-                        "Writing paks", total=total, unit="pak"
-                    )
-                else:
-                    progress.update(
-                        writing_task_id,
-                        total=total,
-                        completed=0,
-                        description="Writing paks",
-                        unit="pak",
-                        visible=True,
-                    )
-
-            elif stripped.startswith("Wrote"):
-                if writing_task_id is not None:
-                    progress.advance(writing_task_id)
-
-            elif stripped != "":
-                console.log(stripped)
-            else:
-                # blank line heartbeat
-                progress.refresh()
+        # keep UI responsive while idle
+        heartbeat = asyncio.create_task(refresh_periodically(progress))
+        try:
+            async for line in process.stdout:
+                stripped = line.decode().strip()
+
+                if stripped.startswith("Found") and stripped.endswith("files to pack."):
+                    # Switch to packing phase
+                    if writing_task_id is not None:
+                        progress.update(writing_task_id, visible=False)
+
+                    number = _NUMBER_PATTERN.search(stripped).group()
+                    total = int(number)
+
+                    if packing_task_id is None:
+                        packing_task_id = progress.add_task(
+                            "Packing SFX", total=total, unit="file"
+                        )
+                    else:
+                        progress.update(
+                            packing_task_id,
+                            total=total,
+                            completed=0,
+                            description="Packing SFX",
+                            unit="file",
+                            visible=True,
+                        )
+
+                elif stripped.startswith("Processed file"):
+                    if packing_task_id is not None:
+                        progress.advance(packing_task_id)
+
+                elif stripped.startswith("Will write"):
+                    # Switch to writing phase
+                    if packing_task_id is not None:
+                        progress.update(packing_task_id, visible=False)
+
+                    number = _NUMBER_PATTERN.search(stripped).group()
+                    total = int(number)
+
+                    if writing_task_id is None:
+                        writing_task_id = progress.add_task(
+                            "Writing paks", total=total, unit="pak"
+                        )
+                    else:
+                        progress.update(
+                            writing_task_id,
+                            total=total,
+                            completed=0,
+                            description="Writing paks",
+                            unit="pak",
+                            visible=True,
+                        )
+
+                elif stripped.startswith("Wrote"):
+                    if writing_task_id is not None:
+                        progress.advance(writing_task_id)
+
+                elif stripped != "":
+                    console.log(stripped)
+        finally:
+            heartbeat.cancel()
 
         # Hide any remaining tasks
         if packing_task_id is not None:
@@ -4,7 +4,7 @@ import asyncio
 import os
 import shutil
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 import config
 import lib.ffmpeg as ffmpeg
@@ -36,8 +36,19 @@ async def _poetry_get_venv(path: str) -> str:
     return lines[0].decode()
 
 
+_rvc_executable: Optional[str] = None
+
+
 async def _get_rvc_executable() -> str:
-    """Resolve the Python executable for the RVC environment."""
+    """Resolve the Python executable for the RVC environment.
+
+    The result is cached for the process lifetime, as resolving it may
+    spawn a (slow) Poetry subprocess.
+    """
+    global _rvc_executable
+    if _rvc_executable is not None:
+        return _rvc_executable
+
     rvc_path = os.getenv("RVC_PATH")
     if not rvc_path:
         raise RuntimeError("RVC_PATH environment variable is not set.")
@@ -46,10 +57,12 @@ async def _get_rvc_executable() -> str:
     if not venv:
         venv = await _poetry_get_venv(rvc_path)
 
-    return os.path.join(rvc_path, venv, "python")
+    _rvc_executable = os.path.join(rvc_path, venv, "python")
+    return _rvc_executable
 
 
 UVR_DONE_TOKEN = "##done##"
+FFMPEG_BATCH_SIZE = 16
 
 
 class UVR:
@@ -64,12 +77,21 @@ class UVR:
         self.process: Optional[asyncio.subprocess.Process] = None
         self._progress: Optional["Progress"] = None
         self._task_id: Optional[int] = None
-
-    async def start(self, total: int, title: str = "Isolating vocals") -> None:
+        self._owns_progress = True
+        self._pending: list[str] = []
+
+    async def start(
+        self,
+        total: int,
+        title: str = "Isolating vocals",
+        progress: Optional["Progress"] = None,
+    ) -> None:
         """Start the UVR subprocess and initialize progress tracking."""
         cwd = Path.cwd()
-        progress = create_progress()
-        progress.start()
+        self._owns_progress = progress is None
+        if progress is None:
+            progress = create_progress()
+            progress.start()
         self._progress = progress
         self._task_id = progress.add_task(title, total=total, unit="file")
 
@@ -94,36 +116,28 @@ class UVR:
             self._stop_progress()
             raise
 
-    async def run(self) -> None:
-        """Monitor the UVR subprocess for progress updates."""
+    async def run(self, on_done: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """Monitor the UVR subprocess for progress updates.
+
+        When given, ``on_done`` is awaited for every finished file.
+        """
         process = self._ensure_process()
 
+        keepalive = asyncio.create_task(self._keepalive())
         try:
-            while True:
-                if process.returncode is not None:
-                    break
-
-                try:
-                    line = await asyncio.wait_for(process.stdout.readline(), 5)
-                except asyncio.TimeoutError:
-                    stdin = process.stdin
-                    if stdin and not stdin.is_closing():
-                        stdin.write(b"\n")
-                        await stdin.drain()
-                    continue
-
-                if not line:
-                    continue
-
+            async for line in process.stdout:
                 message = line.decode().strip()
                 if not message:
                     continue
 
                 if message == UVR_DONE_TOKEN:
                     self._advance_progress()
+                    if on_done is not None:
+                        await on_done()
                 else:
                     console.log(message)
         finally:
+            keepalive.cancel()
             if process.returncode is None:
                 await process.wait()
             self._stop_progress()
@@ -133,15 +147,47 @@ class UVR:
                 f"UVR process exited with code: {process.returncode}"
             )
 
+    async def _keepalive(self, interval: float = 5) -> None:
+        """Periodically ping the subprocess so it keeps polling its queue."""
+        process = self._ensure_process()
+        while True:
+            await asyncio.sleep(interval)
+            if self._progress is not None:
+                self._progress.refresh()
+            stdin = process.stdin
+            if stdin and not stdin.is_closing():
+                stdin.write(b"\n")
+                await stdin.drain()
+
     async def submit(self, file: str) -> None:
-        """Submit a file to the UVR subprocess."""
+        """Queue a file; full frames of batchsize files are flushed at once."""
+        self._pending.append(file)
+        if len(self._pending) >= self.batchsize:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered filenames to the subprocess as one frame."""
+        if not self._pending:
+            return
+
         process = self._ensure_process()
         stdin = process.stdin
         if stdin is None:
             raise RuntimeError("UVR process stdin is not available.")
-        stdin.write(f"{file}\n".encode())
+
+        frame = "\0".join(self._pending) + "\n"
+        self._pending.clear()
+        stdin.write(frame.encode())
         await stdin.drain()
 
+    async def close(self) -> None:
+        """Signal the subprocess that no more files will be submitted."""
+        await self.flush()
+        process = self._ensure_process()
+        stdin = process.stdin
+        if stdin and not stdin.is_closing():
+            stdin.close()
+
     def _ensure_process(self) -> asyncio.subprocess.Process:
         if self.process is None:
             raise RuntimeError("UVR process has not been started.")
@@ -153,7 +199,10 @@ class UVR:
 
     def _stop_progress(self) -> None:
         if self._progress is not None:
-            self._progress.stop()
+            if self._owns_progress:
+                self._progress.stop()
+            elif self._task_id is not None:
+                self._progress.update(self._task_id, visible=False)
             self._progress = None
             self._task_id = None
 
@@ -171,12 +220,19 @@ async def isolate_vocals(
     if overwrite:
         files = list(find_files(input_path))
     else:
+        # enumerate existing outputs once instead of stat-ing per file
+        existing_outputs = (
+            {entry.name for entry in os.scandir(output_path)}
+            if os.path.isdir(output_path)
+            else set()
+        )
+
         files = []
         skipped = 0
         for file in find_files(input_path):
             filename = os.path.basename(file)
             output_filename = _get_output_filename(filename, config.UVR_FIRST_MODEL)
-            if os.path.exists(os.path.join(output_path, output_filename)):
+            if output_filename in existing_outputs:
                 skipped += 1
             else:
                 files.append(file)
@@ -191,20 +247,51 @@ async def isolate_vocals(
     split_path = os.path.join(cache_path, "split")
 
     uvr_split = UVR(config.UVR_FIRST_MODEL, formatted_path, split_path, batchsize)
-    ffmpegs = Parallel("[Phase 1/3] Converting files", leave=True)
+    uvr_dereverb = UVR(
+        config.UVR_SECOND_MODEL,
+        formatted_path,
+        split_path,
+        batchsize / 4,
+    )
+
+    progress = create_progress()
+    progress.start()
+
+    ffmpegs = Parallel(
+        "[Phase 1/3] Converting files",
+        unit="batch",
+        progress=progress,
+        leave=True,
+    )
+
+    submitted: list[str] = []
+
+    async def convert_and_process(batch: list[str]) -> None:
+        pairs = []
+        output_files = []
+
+        for file in batch:
+            dirname = os.path.dirname(file)
+            os.makedirs(os.path.join(formatted_path, dirname), exist_ok=True)
+
+            output_file = file.replace(".ogg", ".wav")
+            output_wav = os.path.join(formatted_path, output_file)
+            output_files.append(output_file)
+            if overwrite or not os.path.exists(output_wav):
+                pairs.append((os.path.join(input_path, file), output_wav))
 
-    async def convert_and_process(file: str) -> None:
-        dirname = os.path.dirname(file)
-        os.makedirs(os.path.join(formatted_path, dirname), exist_ok=True)
+        if pairs:
+            await ffmpeg.to_wav_many(pairs)
 
-        output_file = file.replace(".ogg", ".wav")
-        output_wav = os.path.join(formatted_path, output_file)
-        if overwrite or not os.path.exists(output_wav):
-            await ffmpeg.to_wav(os.path.join(input_path, file), output_wav)
+        for file, output_file in zip(batch, output_files):
+            await uvr_split.submit(output_file)
+            submitted.append(file)
 
-        await uvr_split.submit(output_file)
+    # one walk of the split cache replaces an exists() call per file
+    existing_split = set(find_files(split_path)) if not overwrite else set()
 
-    cached = 0
+    queued: list[str] = []
+    cached_files: list[str] = []
     for file in files:
         if not overwrite:
             filename = os.path.basename(file)
@@ -213,28 +300,68 @@ async def isolate_vocals(
             output_filename = _get_output_filename(
                 output_filename, config.UVR_FIRST_MODEL
             )
-            if os.path.exists(os.path.join(split_path, dirname, output_filename)):
-                cached += 1
+            if os.path.join(dirname, output_filename) in existing_split:
+                cached_files.append(file)
                 continue
 
-        ffmpegs.run(convert_and_process, file)
-
-    if cached:
-        console.log(f"[yellow]Skipping {cached} already split files.[/]")
-
-    await uvr_split.start(ffmpegs.count_jobs(), "[Phase 2/3] Splitting vocals")
-    await asyncio.gather(ffmpegs.wait(), uvr_split.run())
-
-    uvr_dereverb = UVR(
-        config.UVR_SECOND_MODEL,
-        formatted_path,
-        split_path,
-        batchsize / 4,
-    )
-    await uvr_dereverb.start(len(files), "[Phase 3/3] Removing reverb")
-    for file in files:
-        await uvr_dereverb.submit(file)
-    await uvr_dereverb.run()
+        queued.append(file)
+
+    # batch conversions so one ffmpeg process serves many small files
+    for start in range(0, len(queued), FFMPEG_BATCH_SIZE):
+        ffmpegs.run(convert_and_process, queued[start : start + FFMPEG_BATCH_SIZE])
+
+    if cached_files:
+        console.log(f"[yellow]Skipping {len(cached_files)} already split files.[/]")
+
+    try:
+        await uvr_split.start(
+            len(queued), "[Phase 2/3] Splitting vocals", progress=progress
+        )
+        await uvr_dereverb.start(
+            len(files), "[Phase 3/3] Removing reverb", progress=progress
+        )
+
+        total_dereverb = len(files)
+        split_done = 0
+        fed = 0
+
+        async def feed_dereverb() -> None:
+            """Pipeline: hand a file to dereverb as soon as its split is done."""
+            nonlocal split_done, fed
+            file = submitted[split_done]
+            split_done += 1
+            await uvr_dereverb.submit(file)
+            fed += 1
+            if fed >= total_dereverb:
+                await uvr_dereverb.close()
+
+        # files with a cached split output can enter dereverb right away
+        for file in cached_files:
+            await uvr_dereverb.submit(file)
+            fed += 1
+        if fed >= total_dereverb:
+            await uvr_dereverb.close()
+
+        async def convert_all() -> None:
+            await ffmpegs.wait()
+            await uvr_split.close()
+
+        async def split_all() -> None:
+            try:
+                await uvr_split.run(on_done=feed_dereverb)
+            finally:
+                # once the split process exits no more done tokens can come;
+                # close dereverb even if some splits failed to report, or its
+                # stdin never sees EOF and the gather below hangs forever
+                await uvr_dereverb.close()
+
+        await asyncio.gather(
+            convert_all(),
+            split_all(),
+            uvr_dereverb.run(),
+        )
+    finally:
+        progress.stop()
 
     console.log("Cleaning up...")
     shutil.rmtree(config.TMP_PATH, ignore_errors=True)
@@ -1,9 +1,12 @@
-import json
-import re
-from itertools import chain
-from multiprocessing import Pool
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+
 from util import find_files
 from util.rich_console import console, create_progress
 
@@ -12,8 +15,9 @@ GENDERS = ("female", "male")
 VOICEOVER_PREFIX = "voiceovermap"
 JSON_SUFFIX = ".json.json"
 DATA_ENTRY_KEYS = ("Data", "RootChunk", "root", "Data", "entries")
-_SANITIZE_PATTERN = re.compile(r".$")
-_WORD_PATTERN = re.compile(r"\w+")
+_VARIANT_TOKENS = tuple(f"{gender}Variant".encode() for gender in GENDERS)
+_SANITIZE_TABLE = str.maketrans({".": ",-;"})
+TTS_BATCH_SIZE = 8
 
 
 def _strip_suffix(value: str, suffix: str) -> str:
@@ -33,10 +37,22 @@ def _normalize_depot_path(depot_path: str, skip_token: str) -> str:
     return normalized.replace(skip_token, "{}")
 
 
-def _load_entries(root: Path, relative_path: str) -> List[Dict[str, Any]]:
+def _load_entries(
+    root: Path,
+    relative_path: str,
+    require_tokens: Optional[tuple[bytes, ...]] = None,
+) -> List[Dict[str, Any]]:
     file_path = root / Path(relative_path)
-    with file_path.open("r", encoding="utf-8") as handle:
-        data = json.load(handle)
+    raw = file_path.read_bytes()
+
+    # a byte scan is orders of magnitude cheaper than the JSON parse, so
+    # reject files that can't contain what we're after before parsing
+    if require_tokens is not None and not any(token in raw for token in require_tokens):
+        return []
+
+    # orjson decodes the multi-MB voiceover JSONs several times faster
+    # than the stdlib parser
+    data = orjson.loads(raw)
 
     entries: Any = data
     for key in DATA_ENTRY_KEYS:
@@ -44,23 +60,20 @@ def _load_entries(root: Path, relative_path: str) -> List[Dict[str, Any]]:
     return entries
 
 
-def _extract_effect_type(relative_path: str) -> str:
-    filename = Path(relative_path).name
-    stem = filename.split(".", 2)[0]
-    effect = stem.split("_")[-1]
+def _extract_effect_type(basename: str) -> str:
+    stem = basename.partition(".")[0]
+    effect = stem.rpartition("_")[2]
     return "main" if effect in ("1", VOICEOVER_PREFIX) else effect
 
 
-def _is_voiceovermap_file(relative_path: str) -> bool:
-    filename = Path(relative_path).name
-    return filename.startswith(VOICEOVER_PREFIX) and filename.endswith(JSON_SUFFIX)
+def _is_voiceovermap_file(basename: str) -> bool:
+    return basename.startswith(VOICEOVER_PREFIX) and basename.endswith(JSON_SUFFIX)
 
 
-def _is_subtitle_candidate(relative_path: str) -> bool:
-    filename = Path(relative_path).name
-    if not filename.endswith(JSON_SUFFIX):
+def _is_subtitle_candidate(basename: str) -> bool:
+    if not basename.endswith(JSON_SUFFIX):
         return False
-    return not filename.startswith((VOICEOVER_PREFIX, "subtitles"))
+    return not basename.startswith((VOICEOVER_PREFIX, "subtitles"))
 
 
 def _build_subtitle_item(
@@ -81,32 +94,49 @@ def _build_subtitle_item(
     return item
 
 
+def _scan_subtitle_file(
+    root: Path,
+    relative_path: str,
+    skip_token: str,
+) -> List[tuple[str, Dict[str, Any]]]:
+    """Parse one subtitle file and return its (stringId, item) pairs."""
+    entries = _load_entries(root, relative_path, _VARIANT_TOKENS)
+
+    items: List[tuple[str, Dict[str, Any]]] = []
+    for entry in entries:
+        item = _build_subtitle_item(entry, relative_path, skip_token)
+        if item:
+            items.append((entry["stringId"], item))
+    return items
+
+
 def map_subtitles(path: str, locale: str) -> Dict[str, Dict[str, Any]]:
     """Map subtitle entries to their corresponding voiceover audio files."""
 
     root = Path(path)
     skip_token = f"localization/{locale}"
 
+    # split the basename once per file instead of building Path objects
     subtitle_files = [
         rel_path
         for rel_path in find_files(path, JSON_SUFFIX, locale)
-        if _is_subtitle_candidate(rel_path)
+        if _is_subtitle_candidate(rel_path.rpartition(os.sep)[2])
     ]
     map_files = [
-        rel_path
+        (rel_path, basename)
         for rel_path in chain(
             find_files(path, subfolder=locale),
             find_files(path, subfolder="en-us"),
             find_files(path, subfolder="common"),
         )
-        if _is_voiceovermap_file(rel_path)
+        if _is_voiceovermap_file(basename := rel_path.rpartition(os.sep)[2])
     ]
 
     vo_map: Dict[str, Dict[str, Any]] = {}
     found_files: set[str] = set()
     not_found_subtitles: set[str] = set()
 
-    with create_progress() as progress:
+    with create_progress() as progress, ProcessPoolExecutor() as executor:
         scan_task = (
             progress.add_task(
                 "Scanning subtitle files",
@@ -117,12 +147,15 @@ def map_subtitles(path: str, locale: str) -> Dict[str, Dict[str, Any]]:
             else None
         )
 
-        for relative_path in subtitle_files:
-            entries = _load_entries(root, relative_path)
-            for entry in entries:
-                item = _build_subtitle_item(entry, relative_path, skip_token)
-                if item:
-                    vo_map[entry["stringId"]] = item
+        # parse files on all cores; merging stays in this process
+        for items in executor.map(
+            _scan_subtitle_file,
+            repeat(root),
+            subtitle_files,
+            repeat(skip_token),
+            chunksize=32,
+        ):
+            vo_map.update(items)
             if scan_task is not None:
                 progress.advance(scan_task)
 
@@ -136,9 +169,17 @@ def map_subtitles(path: str, locale: str) -> Dict[str, Dict[str, Any]]:
             else None
         )
 
-        for relative_path in map_files:
-            effect_type = _extract_effect_type(relative_path)
-            entries = _load_entries(root, relative_path)
+        # the merge below is order-dependent, so only the parse is pooled
+        for (relative_path, basename), entries in zip(
+            map_files,
+            executor.map(
+                _load_entries,
+                repeat(root),
+                [rel_path for rel_path, _ in map_files],
+                chunksize=8,
+            ),
+        ):
+            effect_type = _extract_effect_type(basename)
 
             for entry in entries:
                 string_id = entry["stringId"]
@@ -196,28 +237,42 @@ def map_subtitles(path: str, locale: str) -> Dict[str, Dict[str, Any]]:
 _g_tts: Any = None
 _g_reference: Optional[str] = None
 _g_language: Optional[str] = None
+_g_cond_cache: Dict[str, Any] = {}
 
 
-def _init_tts_worker(reference: str, language: str) -> None:
-    """Initialize the TTS engine inside a worker process."""
+def _init_tts(reference: str, language: str) -> None:
+    """Load the TTS engine into this process."""
     global _g_tts, _g_reference, _g_language
     _g_reference = reference
     _g_language = language
 
+    import torch  # type: ignore
     from TTS.api import TTS  # type: ignore
 
     _g_tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to("cuda")
 
+    # warm the conditioning cache for the default reference voice; weights
+    # stay FP32 so this runs outside autocast, inference autocasts to FP16
+    _get_conditioning(reference)
 
-def _sanitize_text(text: str) -> str:
-    sanitized = _SANITIZE_PATTERN.sub("", text)
-    return sanitized.replace(".", ",-;")
 
+def _get_conditioning(reference: str) -> Any:
+    """Return the (cached) XTTS conditioning latents for a reference wav."""
+    cond = _g_cond_cache.get(reference)
+    if cond is None:
+        cond = _g_tts.synthesizer.tts_model.get_conditioning_latents(
+            audio_path=reference
+        )
+        _g_cond_cache[reference] = cond
+    return cond
 
-def _tts_worker(entry: Sequence[str]) -> None:
-    if not entry:
-        return
 
+def _sanitize_text(text: str) -> str:
+    # drop the trailing punctuation and soften sentence breaks
+    return text[:-1].translate(_SANITIZE_TABLE) if text else text
+
+
+def _tts_line(entry: Sequence[str]) -> None:
     file_path = entry[0]
     text = entry[1]
     reference = entry[2] if len(entry) > 2 else _g_reference
@@ -229,18 +284,62 @@ def _tts_worker(entry: Sequence[str]) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     sanitized_text = _sanitize_text(text)
-    if not sanitized_text or not _WORD_PATTERN.match(sanitized_text):
+    if not sanitized_text:
+        return
+    first = sanitized_text[0]
+    if not (first.isalnum() or first == "_"):
         return
 
-    _g_tts.tts_to_file(
-        text=sanitized_text,
-        speaker_wav=reference,
-        language=_g_language,
-        file_path=file_path,
-    )
+    import numpy as np  # type: ignore
+    import soundfile  # type: ignore
+    import torch  # type: ignore
+
+    # reuse the speaker conditioning instead of re-encoding the reference
+    # wav for every line
+    gpt_cond_latent, speaker_embedding = _get_conditioning(reference)
+
+    with torch.autocast("cuda", dtype=torch.float16):
+        result = _g_tts.synthesizer.tts_model.inference(
+            text=sanitized_text,
+            language=_g_language,
+            gpt_cond_latent=gpt_cond_latent,
+            speaker_embedding=speaker_embedding,
+        )
+
+    # soundfile can't write float16 buffers from the autocast path
+    soundfile.write(file_path, np.asarray(result["wav"], dtype=np.float32), 24000)
 
 
-def generate_speech(
+def _tts_worker(batch: Sequence[Sequence[str]]) -> int:
+    for entry in batch:
+        if entry:
+            _tts_line(entry)
+    return len(batch)
+
+
+def _batch_lines(
+    files: List[List[str]],
+    size: int,
+) -> List[List[List[str]]]:
+    """Group lines into batches that share the same reference voice."""
+    batches: List[List[List[str]]] = []
+    current: List[List[str]] = []
+    current_reference: Optional[str] = None
+
+    for entry in files:
+        reference = entry[2] if len(entry) > 2 else None
+        if current and (len(current) >= size or reference != current_reference):
+            batches.append(current)
+            current = []
+        current_reference = reference
+        current.append(entry)
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def generate_speech(
     files: List[List[str]],
     reference: str,
     language: str,
@@ -253,12 +352,30 @@ def generate_speech(
 
     console.log("Loading TTS...")
 
+    # a single shared model: VRAM usage no longer scales with batchsize
+    _init_tts(reference, language)
+
+    # feed workers batches of lines so they stay warm between utterances
+    queue: asyncio.Queue = asyncio.Queue()
+    for batch in _batch_lines(files, TTS_BATCH_SIZE):
+        queue.put_nowait(batch)
+
+    loop = asyncio.get_running_loop()
+
     with create_progress() as progress:
         task = progress.add_task(
             "Generating speech",
             total=len(files),
             unit="line",
         )
-        with Pool(max(batchsize, 1), _init_tts_worker, (reference, language)) as pool:
-            for _ in pool.imap_unordered(_tts_worker, files):
-                progress.advance(task)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                done = await loop.run_in_executor(None, _tts_worker, batch)
+                progress.advance(task, done)
+
+        await asyncio.gather(*(worker() for _ in range(max(batchsize, 1))))
@@ -2,16 +2,15 @@ import asyncio
 import ctypes
 import logging
 import os
+import sys
 from functools import partial
-from inspect import currentframe, getframeinfo
-from pathlib import Path
 from queue import Empty
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 
 from librosa.util.exceptions import ParameterError
 from rich.progress import Progress, TaskID
-from torch.multiprocessing import JoinableQueue, Process, Queue, Value
+from torch.multiprocessing import get_context
 from tqdm import tqdm
 
 import config
@@ -24,43 +23,61 @@ if TYPE_CHECKING:
     from audio_separator.separator import Separator
 
 
-old_tqdm_init = tqdm.__init__
+UVR_QUEUE_BATCH = 8
 
+# spawn avoids CUDA-after-fork deadlocks in the worker processes
+_spawn_ctx = get_context("spawn")
 
-def new_tqdm_init(*args, **kwargs):
-    """Disable tqdm progress bar for audio_separator."""
-    frame = currentframe()
-    if frame is not None:
-        frame = frame.f_back
+class _NullTqdm:
+    """No-op tqdm stand-in for audio_separator's internal progress bars."""
 
-    disable = False
+    def __init__(self, iterable=None, *_args, **_kwargs):
+        self.iterable = iterable
+        self.n = 0
 
-    while frame is not None:
-        try:
-            frame_info = getframeinfo(frame)
-        except (OSError, RuntimeError):
-            frame = frame.f_back
-            continue
+    def __iter__(self):
+        return iter(self.iterable if self.iterable is not None else ())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def update(self, *_args, **_kwargs):
+        pass
+
+    def set_description(self, *_args, **_kwargs):
+        pass
 
-        if "audio_separator" in Path(frame_info.filename).parts:
-            disable = True
-            break
+    def close(self):
+        pass
 
-        frame = frame.f_back
 
-    if disable:
-        kwargs.setdefault("disable", True)
+def _silence_audio_separator_tqdm():
+    """Shadow tqdm inside audio_separator's modules with a no-op.
 
-    old_tqdm_init(*args, **kwargs)
+    Patching only the names the package imported avoids the global
+    tqdm.__init__ override that walked the call stack on every tqdm()
+    construction anywhere in the process.
+    """
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("audio_separator") or module is None:
+            continue
+        if getattr(module, "tqdm", None) is tqdm:
+            module.tqdm = _NullTqdm
 
 
-tqdm.__init__ = new_tqdm_init
+# directories already created by this worker process
+_made_dirs: set[str] = set()
 
 
 def _custom_final_process(
     output_path: str, filename: str, self, _stem_path, source, stem_name
 ):
-    os.makedirs(output_path, exist_ok=True)
+    if output_path not in _made_dirs:
+        os.makedirs(output_path, exist_ok=True)
+        _made_dirs.add(output_path)
     self.write_audio(
         os.path.join(output_path, f"{filename}_{stem_name.lower()}.wav"),
         source,
@@ -69,45 +86,76 @@ def _custom_final_process(
     return {stem_name: source}
 
 
-class UVRProcess(Process):
+def _cell_final_process(cell: list, self, _stem_path, source, stem_name):
+    return _custom_final_process(cell[0], cell[1], self, _stem_path, source, stem_name)
+
+
+class UVRProcess(_spawn_ctx.Process):
     """Process for running UVR."""
 
-    def __init__(self, queue: Queue = None, progress_counter: Value = None, **kwargs):  # type: ignore
-        Process.__init__(self, **kwargs)
+    def __init__(
+        self,
+        queue=None,
+        progress_counters=None,
+        worker_index: int = 0,
+        model_lock=None,
+        **kwargs,
+    ):
+        _spawn_ctx.Process.__init__(self, **kwargs)
 
-        self._run = Value(ctypes.c_bool, False)
-        self._queue = queue or JoinableQueue()
-        self._progress_counter = progress_counter or Value(ctypes.c_int, 0)
+        self._run = _spawn_ctx.Value(ctypes.c_bool, False)
+        self._queue = queue or _spawn_ctx.JoinableQueue()
+        self._progress_counters = progress_counters or _spawn_ctx.Array(
+            ctypes.c_int64, 1, lock=False
+        )
+        self.worker_index = worker_index
+        self._model_lock = model_lock or _spawn_ctx.Lock()
         self._last_model: Optional[str] = None
         self._separator: Optional["Separator"] = None
+        self._patch_owner: Optional[Any] = None
+        self._patch_cell: Optional[list] = None
 
-    def _separate(self, input_path: str, output_path: str, file: str, attempt=0):
+    def _separate(self, input_path: str, output_path: str, file: str):
         dirname = os.path.dirname(file)
         filename = os.path.basename(file)
 
-        self._separator.model_instance.final_process = partial(
-            _custom_final_process,
-            os.path.join(output_path, dirname),
-            filename,
-            self._separator.model_instance,
-        )
+        model_instance = self._separator.model_instance
+
+        # build the final_process override once per loaded model; per-file
+        # values go through a mutable cell instead of a fresh partial
+        if self._patch_owner is not model_instance:
+            cell = [None, None]
+            model_instance.final_process = partial(
+                _cell_final_process, cell, model_instance
+            )
+            self._patch_owner = model_instance
+            self._patch_cell = cell
 
-        try:
-            return self._separator.separate(os.path.join(input_path, file))
-        except ParameterError:
-            if attempt < 3:
-                return self._separate(input_path, output_path, file, attempt + 1)
-            raise
+        self._patch_cell[0] = os.path.join(output_path, dirname)
+        self._patch_cell[1] = filename
+
+        source = os.path.join(input_path, file)
+
+        for _attempt in range(3):
+            try:
+                return self._separator.separate(source)
+            except ParameterError:
+                continue
+
+        # last attempt propagates the error
+        return self._separator.separate(source)
 
     def terminate(self):
         if self._run:
             self._run = False
         else:
-            Process.terminate(self)
+            _spawn_ctx.Process.terminate(self)
 
     def run(self):
         from audio_separator.separator import Separator
 
+        _silence_audio_separator_tqdm()
+
         self._separator = Separator(
             log_level=logging.WARNING,
             model_file_dir=config.UVR_MODEL_CACHE,
@@ -131,23 +179,33 @@ class UVRProcess(Process):
 
         while self._run:
             try:
-                input_path, output_path, file, wanted_model = self._queue.get(
+                input_path, output_path, files, wanted_model = self._queue.get(
                     timeout=0.1
                 )
             except (Empty, TimeoutError):
                 continue
 
+            index = 0
             try:
                 if wanted_model != self._last_model:
-                    self._separator.load_model(wanted_model)
+                    # serialize loads: the first worker downloads and pulls
+                    # the checkpoint into the page cache, the rest load warm
+                    # instead of fighting for the disk
+                    with self._model_lock:
+                        self._separator.load_model(wanted_model)
                     self._last_model = wanted_model
+                    # load_model may import new architecture modules
+                    _silence_audio_separator_tqdm()
 
-                self._separate(input_path, output_path, file)
+                while index < len(files):
+                    self._separate(input_path, output_path, files[index])
+                    index += 1
 
-                with self._progress_counter.get_lock():
-                    self._progress_counter.value += 1
+                    # we are the only writer of our slot, so no lock is needed
+                    self._progress_counters[self.worker_index] += 1
             except Exception:
-                self._queue.put((input_path, output_path, file, wanted_model))
+                # requeue the failed file and everything after it
+                self._queue.put((input_path, output_path, files[index:], wanted_model))
                 raise
             finally:
                 self._queue.task_done()
@@ -157,26 +215,56 @@ class UVRProcessManager:
     """Manage multiple UVR processes."""
 
     def __init__(self, jobs=1):
-        self._queue = JoinableQueue()
-        self._progress_counter = Value(ctypes.c_int, 0)
+        self._queue = _spawn_ctx.JoinableQueue()
+        # one slot per worker: single-writer slots need no lock
+        self._progress_counters = _spawn_ctx.Array(ctypes.c_int64, jobs, lock=False)
+        self._seen_progress = 0
         self._wanted_model: Optional[str] = None
+        self._pending: list[str] = []
+        self._pending_paths: Optional[tuple[str, str]] = None
+        self._model_lock = _spawn_ctx.Lock()
 
         self._workers = set(
-            UVRProcess(self._queue, self._progress_counter) for _ in range(jobs)
+            UVRProcess(self._queue, self._progress_counters, index, self._model_lock)
+            for index in range(jobs)
         )
 
         self._progress_display: Optional[Progress] = None
         self._progress_task_id: Optional[TaskID] = None
+        self._progress_task = None
 
         for worker in self._workers:
             worker.start()
 
     def submit(self, input_path: str, output_path: str, file: str):
-        """Submit work to workers."""
+        """Submit work to workers; full batches are flushed as one item."""
+        self.submit_many(input_path, output_path, [file])
+
+    def submit_many(self, input_path: str, output_path: str, files: list[str]):
+        """Submit many files at once, avoiding one queue put per file."""
         if self._wanted_model is None:
             raise ValueError("No model has been set yet.")
 
-        self._queue.put((input_path, output_path, file, self._wanted_model))
+        if self._pending and self._pending_paths != (input_path, output_path):
+            self.flush()
+
+        self._pending_paths = (input_path, output_path)
+        self._pending.extend(files)
+
+        # keep items batch-sized so work still spreads across workers
+        while len(self._pending) >= UVR_QUEUE_BATCH:
+            batch = self._pending[:UVR_QUEUE_BATCH]
+            self._pending = self._pending[UVR_QUEUE_BATCH:]
+            self._queue.put((input_path, output_path, batch, self._wanted_model))
+
+    def flush(self):
+        """Send any buffered files to the workers."""
+        if not self._pending:
+            return
+
+        input_path, output_path = self._pending_paths
+        self._queue.put((input_path, output_path, self._pending, self._wanted_model))
+        self._pending = []
 
     def set_model(self, model: str):
         """Change to loaded model."""
@@ -193,9 +281,10 @@ class UVRProcessManager:
         """Attach a Rich progress task to track worker progress."""
         self._progress_display = progress
         self._progress_task_id = task_id
+        # resolve the task object once instead of scanning per watch tick
+        self._progress_task = self._get_progress_task()
 
-        with self._progress_counter.get_lock():
-            self._progress_counter.value = 0
+        self._seen_progress = sum(self._progress_counters)
 
         update_kwargs = {"completed": 0}
         if total is not None:
@@ -205,9 +294,9 @@ class UVRProcessManager:
 
         self._progress_display.update(task_id, **update_kwargs)
 
-    def wait(self):
-        """Wait for all workers to finish."""
-        self._queue.join()
+    async def wait(self):
+        """Wait for all workers to finish without blocking the event loop."""
+        await asyncio.to_thread(self._queue.join)
 
     def _get_progress_task(self):
         """Retrieve the current rich progress task with backward compatibility."""
@@ -231,30 +320,33 @@ class UVRProcessManager:
 
     async def watch(self):
         """Wait and update the progress asynchronously."""
-        task = self._get_progress_task()
+        task = self._progress_task
+        if task is None:
+            raise RuntimeError("Progress has not been configured.")
         if task.total is not None and task.total == 0:
             return
 
         while True:
-            increment = 0
-
-            with self._progress_counter.get_lock():
-                if self._progress_counter.value:
-                    increment = self._progress_counter.value
-                    self._progress_counter.value = 0
+            completed = sum(self._progress_counters)
+            increment = completed - self._seen_progress
 
             if increment:
+                self._seen_progress = completed
                 self._progress_display.advance(self._progress_task_id, increment)
 
             for worker in [*self._workers]:
                 if worker.exitcode is not None:
                     console.log("[yellow]WARNING[/]: A worker died, respawning...")
                     self._workers.remove(worker)
-                    new_worker = UVRProcess(self._queue, self._progress_counter)
+                    new_worker = UVRProcess(
+                        self._queue,
+                        self._progress_counters,
+                        worker.worker_index,
+                        self._model_lock,
+                    )
                     new_worker.start()
                     self._workers.add(new_worker)
 
-            task = self._get_progress_task()
             if task.total is not None and task.completed >= task.total:
                 break
 
@@ -282,21 +374,35 @@ async def isolate_vocals(
     split_path = os.path.join(cache_path, config.UVR_FIRST_CACHE)
     reverb_path = os.path.join(cache_path, config.UVR_SECOND_CACHE)
 
-    files = set(find_files(input_path))
-
-    if not overwrite:
-        skipped = 0
-
-        for file in list(files):
-            output_file = file.replace(".ogg", ".wav") + config.UVR_SECOND_SUFFIX
-            if os.path.exists(os.path.join(reverb_path, output_file)):
-                skipped += 1
-                files.remove(file)
+    def scan_input():
+        # compute each file's converted .wav name once; every loop below
+        # needs it
+        return [
+            (file, file.replace(".ogg", ".wav"))
+            for file in set(find_files(input_path))
+        ]
 
-        console.log(f"Skipping {skipped} already done files.")
+    # overlap the input walk with worker process startup
+    entries_task = asyncio.create_task(asyncio.to_thread(scan_input))
+    uvr_workers = UVRProcessManager(n_workers)
+    entries = await entries_task
 
-    if len(files) == 0:
+    if not overwrite:
+        # one walk of the output tree replaces a stat call per file
+        done = set(find_files(reverb_path))
+        remaining = [
+            (file, converted)
+            for file, converted in entries
+            if converted + config.UVR_SECOND_SUFFIX not in done
+        ]
+
+        console.log(f"Skipping {len(entries) - len(remaining)} already done files.")
+        entries = remaining
+
+    if len(entries) == 0:
         console.log("No files to process.")
+        uvr_workers.terminate()
+        uvr_workers.join()
         return
 
     with create_progress() as progress:
@@ -318,7 +424,6 @@ async def isolate_vocals(
             visible=False,
         )
 
-        uvr_workers = UVRProcessManager(n_workers)
         uvr_workers.set_model(config.UVR_FIRST_MODEL)
         uvr_workers.configure_progress(
             progress,
@@ -327,31 +432,33 @@ async def isolate_vocals(
             visible=False,
         )
 
-        async def convert_and_process(file: str):
-            dirname = os.path.dirname(file)
-            os.makedirs(os.path.join(formatted_path, dirname), exist_ok=True)
+        made_dirs: set[str] = set()
+
+        async def convert_and_process(file: str, converted_file: str):
+            dirname = os.path.join(formatted_path, os.path.dirname(file))
+            if dirname not in made_dirs:
+                os.makedirs(dirname, exist_ok=True)
+                made_dirs.add(dirname)
 
-            converted_file = file.replace(".ogg", ".wav")
             converted_path = os.path.join(formatted_path, converted_file)
             if overwrite or not os.path.exists(converted_path):
                 await ffmpeg.to_wav(os.path.join(input_path, file), converted_path)
 
             uvr_workers.submit(formatted_path, split_path, converted_file)
 
+        existing_split = set(find_files(split_path)) if not overwrite else set()
         split_files = []
 
-        for file in files:
-            output_file = file.replace(".ogg", ".wav") + config.UVR_FIRST_SUFFIX
+        for file, converted in entries:
+            output_file = converted + config.UVR_FIRST_SUFFIX
 
-            if not overwrite:
-                output = os.path.join(split_path, output_file)
-                if os.path.exists(output):
-                    continue
+            if not overwrite and output_file in existing_split:
+                continue
 
             split_files.append(output_file)
-            ffmpegs.run(convert_and_process, file)
+            ffmpegs.run(convert_and_process, file, converted)
 
-        cached = len(files) - len(split_files)
+        cached = len(entries) - len(split_files)
 
         if not overwrite and cached > 0:
             console.log(f"Won't split {cached} already split files.")
@@ -363,13 +470,17 @@ async def isolate_vocals(
             visible=len(split_files) > 0,
         )
 
-        await asyncio.gather(ffmpegs.wait(), uvr_workers.watch())
+        async def convert_all():
+            await ffmpegs.wait()
+            uvr_workers.flush()
+
+        await asyncio.gather(convert_all(), uvr_workers.watch())
         progress.update(split_task_id, visible=False)
 
         console.log("Waiting for workers...")
-        uvr_workers.wait()
+        await uvr_workers.wait()
 
-        reverb_total = len(files)
+        reverb_total = len(entries)
         uvr_workers.set_model(config.UVR_SECOND_MODEL)
         uvr_workers.configure_progress(
             progress,
@@ -378,15 +489,18 @@ async def isolate_vocals(
             visible=reverb_total > 0,
         )
 
-        for file in files:
-            input_file = file.replace(".ogg", ".wav") + config.UVR_FIRST_SUFFIX
-            uvr_workers.submit(split_path, reverb_path, input_file)
+        uvr_workers.submit_many(
+            split_path,
+            reverb_path,
+            [converted + config.UVR_FIRST_SUFFIX for _file, converted in entries],
+        )
+        uvr_workers.flush()
 
         await uvr_workers.watch()
         progress.update(reverb_task_id, visible=False)
 
         console.log("Waiting for workers...")
-        uvr_workers.wait()
+        await uvr_workers.wait()
 
         uvr_workers.terminate()
         uvr_workers.join()
@@ -6,13 +6,20 @@ from threading import Thread
 import nest_asyncio
 from waapi import CannotConnectToWaapiException, WaapiClient, WaapiRequestFailed
 
-from util import SubprocessException, spawn, watch_async
+from util import SubprocessException, find_files, spawn, watch_async
 from util.rich_console import console, create_progress
 
 
 nest_asyncio.apply()  # needed for waapi
 
 WWISE_OBJECT_PATH = "\\Actor-Mixer Hierarchy\\Default Work Unit\\"
+WWISE_IMPORT_BATCH = 2000
+
+_SEP_PATTERN = re.compile(r"[\\/]")
+_CONV_ID_PATTERN = re.compile(
+    r"<Conversion Name=\"Vorbis Quality High\" ID=\"{([\w\-]+)}\">"
+)
+_DEFAULT_CONV_PATTERN = re.compile(r"<DefaultConversion(.*)ID=\"\{([\w\-]+)\}\"\/>\n")
 
 
 def _get_wwise_path():
@@ -65,9 +72,7 @@ async def create_project(project_dir: str):
         encoding="utf-8",
     ) as f:
         settings = f.read()
-        findings = re.search(
-            r"<Conversion Name=\"Vorbis Quality High\" ID=\"{([\w\-]+)}\">", settings
-        )
+        findings = _CONV_ID_PATTERN.search(settings)
         conv_id = findings.group(1)
 
     # Patch project settings
@@ -75,8 +80,16 @@ async def create_project(project_dir: str):
     with open(project_path, "r", encoding="utf-8") as f:
         data = f.read()
 
-    data = re.sub(
-        r"<DefaultConversion(.*)ID=\"\{([\w\-]+)\}\"\/>\n",
+    # skip the rewrite when the project already points at the right settings
+    match = _DEFAULT_CONV_PATTERN.search(data)
+    if (
+        match
+        and match.group(2) == conv_id
+        and "Default Conversion Settings" not in data
+    ):
+        return
+
+    data = _DEFAULT_CONV_PATTERN.sub(
         r'<DefaultConversion\g<1>ID="{' + conv_id + '}"/>\n',
         data,
     )
@@ -103,19 +116,18 @@ async def spawn_wwise(project_dir: str):
 
 
 async def _create_waapi(server):
-    waapi = None
+    # retry with backoff instead of hammering the socket while Wwise boots
+    delay = 0.1
     while server.returncode is None:
         try:
-            waapi = WaapiClient(allow_exception=True)
-            break
+            return WaapiClient(allow_exception=True)
         except CannotConnectToWaapiException as err:
             if server.returncode is not None:
                 raise err
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
 
-    if waapi is None:
-        raise CannotConnectToWaapiException()
-
-    return waapi
+    raise CannotConnectToWaapiException()
 
 
 async def wait_waapi_load(waapi: WaapiClient):
@@ -149,6 +161,8 @@ def move_wwise_files(converted_objects: list[dict], output_path: str):
             unit="file",
         )
 
+        made_dirs: set[str] = set()
+
         for obj in sounds:
             original_path = obj["sound:originalWavFilePath"]
             filename = os.path.basename(original_path)[: -len(".wav")]
@@ -157,12 +171,12 @@ def move_wwise_files(converted_objects: list[dict], output_path: str):
             output_dir = os.path.join(output_path, path)
             output = os.path.join(output_dir, filename + ".wem")
 
-            os.makedirs(output_dir, exist_ok=True)
+            if output_dir not in made_dirs:
+                os.makedirs(output_dir, exist_ok=True)
+                made_dirs.add(output_dir)
 
-            if os.path.exists(output):
-                os.unlink(output)
-
-            os.rename(obj["sound:convertedWemFilePath"], output)
+            # os.replace overwrites atomically, no unlink pre-check needed
+            os.replace(obj["sound:convertedWemFilePath"], output)
             progress.advance(task_id)
 
 
@@ -192,37 +206,33 @@ def move_wwise_files_auto(project_dir: str, output_path: str):
     with create_progress(transient=True) as progress:
         task_id = progress.add_task("Moving files", total=len(found_files), unit="file")
 
+        made_dirs: set[str] = set()
+
         for file in found_files:
             new_path = os.path.join(output_path, file.replace("_3F75BDB9", ""))
             new_dir = os.path.dirname(new_path)
 
-            os.makedirs(new_dir, exist_ok=True)
-            if os.path.exists(new_path):
-                os.unlink(new_path)
+            if new_dir not in made_dirs:
+                os.makedirs(new_dir, exist_ok=True)
+                made_dirs.add(new_dir)
 
-            os.rename(os.path.join(cache_dir, file), new_path)
+            os.replace(os.path.join(cache_dir, file), new_path)
             progress.advance(task_id)
 
 
-async def _convert_files(
-    input_path: str, project_dir: str, output_path: str, override: bool, waapi
-):
-    # Wait for load
-    await wait_waapi_load(waapi)
-
-    console.log("Starting automation mode...")
-
-    # Setup
-    waapi.call("ak.wwise.debug.enableAutomationMode", {"enable": True})
-
-    # List all files
-    console.log("Starting import...")
+def _scan_import_files(input_path: str, output_path: str, override: bool):
+    """List all .wav files to import, skipping already converted ones."""
     to_import = []
     skipped = 0
 
+    # index existing output once instead of stat-ing per file
+    existing_wems = set(find_files(output_path, ".wem")) if not override else set()
+
     for root, _dirs, files in os.walk(input_path):
         relative_root = root[len(input_path) + 1 :]
-        path = "\\".join("<Folder>" + s for s in re.split(r"[\\/]", relative_root) if s)
+        path = "\\".join(
+            "<Folder>" + s for s in _SEP_PATTERN.split(relative_root) if s
+        )
 
         for file in files:
 
@@ -230,9 +240,8 @@ async def _convert_files(
                 continue
 
             file_path = os.path.join(relative_root, file)
-            if not override and os.path.exists(
-                os.path.join(output_path, re.sub(r"\.wav$", ".wem", file_path))
-            ):
+            # the .wav suffix is guaranteed by the guard above
+            if not override and file_path[:-4] + ".wem" in existing_wems:
                 skipped += 1
                 continue
 
@@ -246,6 +255,29 @@ async def _convert_files(
                 }
             )
 
+    return to_import, skipped
+
+
+async def _convert_files(
+    input_path: str, project_dir: str, output_path: str, override: bool, waapi
+):
+    # walk the input tree while Wwise finishes loading
+    scan_task = asyncio.create_task(
+        asyncio.to_thread(_scan_import_files, input_path, output_path, override)
+    )
+
+    # Wait for load
+    await wait_waapi_load(waapi)
+
+    console.log("Starting automation mode...")
+
+    # Setup
+    waapi.call("ak.wwise.debug.enableAutomationMode", {"enable": True})
+
+    # List all files
+    console.log("Starting import...")
+    to_import, skipped = await scan_task
+
     if skipped > 0:
         console.log(f"Not overwriting {skipped} already processed files")
 
@@ -267,13 +299,18 @@ async def _convert_files(
         )
 
         try:
-            imported_objects = waapi.call(
-                "ak.wwise.core.audio.import",
-                {
-                    "importOperation": "replaceExisting",
-                    "imports": to_import,
-                },
-            )["objects"]
+            imported_objects = []
+
+            # bounded batches keep each WAAPI payload small instead of
+            # serializing the whole index in one JSON-RPC call
+            for start in range(0, len(to_import), WWISE_IMPORT_BATCH):
+                imported_objects += waapi.call(
+                    "ak.wwise.core.audio.import",
+                    {
+                        "importOperation": "replaceExisting",
+                        "imports": to_import[start : start + WWISE_IMPORT_BATCH],
+                    },
+                )["objects"]
         finally:
             if handler is not None:
                 handler.unsubscribe()
@@ -336,36 +373,40 @@ async def _convert_files(
                 unit="file",
             )
 
-            while convert_thread.is_alive():
-                try:
-                    event = event_queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    progress.refresh()
-                    convert_thread.join(0.1)
-                else:
+            def drain_events() -> int:
+                """Count .wem events currently sitting in the queue."""
+                nonlocal completed_imports
+                advanced = 0
+                while True:
+                    try:
+                        event = event_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return advanced
+
                     if (
                         event.src_path.endswith(".wem")
                         and completed_imports < total_imports
                     ):
                         completed_imports += 1
-                        progress.advance(convert_task_id)
+                        advanced += 1
+
+            while convert_thread.is_alive():
+                # drain everything available per tick instead of one event
+                advanced = drain_events()
+                if advanced:
+                    progress.advance(convert_task_id, advanced)
+                else:
+                    progress.refresh()
+                    convert_thread.join(0.1)
 
                 if total_imports > 0 and completed_imports >= total_imports:
                     convert_thread.join(60)
                     break
 
-            while True:
-                try:
-                    event = event_queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
-                else:
-                    if (
-                        event.src_path.endswith(".wem")
-                        and completed_imports < total_imports
-                    ):
-                        completed_imports += 1
-                        progress.advance(convert_task_id)
+            # pick up events that arrived after the thread finished
+            advanced = drain_events()
+            if advanced:
+                progress.advance(convert_task_id, advanced)
 
             progress.update(
                 convert_task_id,
@@ -313,7 +313,7 @@ async def do_tts(args: Namespace):
     done = len(vo_map) - len(files)
     tqdm.write(f"Skipping {done} voice lines already done")
 
-    tts.generate_speech(files, args.reference, args.language, args.batchsize)
+    await tts.generate_speech(files, args.reference, args.language, args.batchsize)
 
 
 async def revoice(args: Namespace):
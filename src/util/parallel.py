@@ -13,6 +13,7 @@ class Parallel:
 
     __jobs: list
     __semaphore: Semaphore
+    __concurrency: int
     __progress: Progress
     __task_id: TaskID
     __immediate: bool
@@ -31,6 +32,7 @@ class Parallel:
     ):
         self.__jobs = []
         self.__semaphore = Semaphore(concurrency)
+        self.__concurrency = concurrency
         self.__progress = progress or create_progress()
         self.__owns_progress = progress is None
 
@@ -63,10 +65,12 @@ class Parallel:
 
     def run(self, func: callable, *args, **kwargs):
         """Runs the given function with limited concurrency."""
-        job = self.__run(func, *args, **kwargs)
         if self.__immediate:
-            job = asyncio.create_task(job)
-        self.__jobs.append(job)
+            self.__jobs.append(asyncio.create_task(self.__run(func, *args, **kwargs)))
+        else:
+            # store the bare call instead of a coroutine frame; the
+            # coroutine is created lazily in wait()
+            self.__jobs.append((func, args, kwargs))
 
     def log(self, message: str):
         """Log a message using the shared console."""
@@ -93,7 +97,20 @@ class Parallel:
                 self.__progress.stop()
             return
 
-        await asyncio.gather(*self.__jobs)
+        # expand jobs in windows so only a bounded number of task objects
+        # exist at once; the semaphore caps real concurrency anyway
+        jobs = self.__jobs
+        self.__jobs = []
+        window = max(self.__concurrency * 4, 1)
+        for start in range(0, total, window):
+            await asyncio.gather(
+                *(
+                    job
+                    if isinstance(job, asyncio.Task)
+                    else self.__run(job[0], *job[1], **job[2])
+                    for job in jobs[start : start + window]
+                )
+            )
 
         if self.__owns_task:
             self.__progress.update(self.__task_id, visible=False)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 from rich.console import Console
 from rich.progress import (
     BarColumn,
@@ -11,7 +13,7 @@ from rich.progress import (
     TimeRemainingColumn,
 )
 
-__all__ = ["console", "create_progress"]
+__all__ = ["console", "create_progress", "refresh_periodically"]
 
 console = Console()
 
@@ -29,3 +31,10 @@ def create_progress(*, transient: bool = False) -> Progress:
         console=console,
         transient=transient,
     )
+
+
+async def refresh_periodically(progress: Progress, interval: float = 0.25) -> None:
+    """Refresh the given progress display at a fixed cadence until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        progress.refresh()